@@ -117,7 +117,10 @@ def list_products():
         products = Product.find_by_category(category_value)
     elif available:
         app.logger.info("Find by availability: %s", available)
-        products = Product.find_by_availability(available)
+        # convert the query string to a boolean so the comparison is
+        # portable across database dialects
+        available_value = available.lower() in ["true", "yes", "1"]
+        products = Product.find_by_availability(available_value)
     else:
         products = Product.all()
 
@@ -0,0 +1,144 @@
+# Copyright 2016, 2023 John J. Rofrano. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+pytest configuration and fixtures for the test suite
+
+When the suite runs under pytest-xdist against PostgreSQL, every worker
+gets its own schema (test_gw0, test_gw1, ...) so parallel workers never
+contend on the same tables. This runs at import time, before the test
+modules read DATABASE_URI and before the service connects.
+
+The fixtures implement the outer-transaction/savepoint pattern used by
+the model tests: the schema is created once per session, each test
+class runs inside one connection-level transaction that is rolled back
+at the end, and each test runs inside a SAVEPOINT that is rolled back
+afterwards.
+"""
+import os
+import logging
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+_worker = os.getenv("PYTEST_XDIST_WORKER")
+_uri = os.getenv("DATABASE_URI", "")
+
+if _worker and _uri.startswith("postgresql"):
+    _schema = f"test_{_worker}"
+    _engine = create_engine(_uri, isolation_level="AUTOCOMMIT")
+    with _engine.connect() as _connection:
+        _connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{_schema}"'))
+    _engine.dispose()
+    os.environ["DATABASE_URI"] = (
+        f"{_uri}{'&' if '?' in _uri else '?'}options=-csearch_path={_schema}"
+    )
+
+# The service must be imported after any DATABASE_URI rewrite above
+# pylint: disable=wrong-import-position
+from service import app  # noqa: E402
+from service.models import Product, db  # noqa: E402
+
+# Unit tests default to in-memory SQLite so no server round-trips or
+# fsyncs are involved; CI sets DATABASE_URI to PostgreSQL for
+# integration runs
+DATABASE_URI = os.getenv("DATABASE_URI", "sqlite:///:memory:")
+
+
+@pytest.fixture(scope="session")
+def app_ctx():
+    """Configures the app and creates the schema once per test session"""
+    app.config["TESTING"] = True
+    app.config["DEBUG"] = False
+    app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_URI
+    # Raise the statement compile cache above the default 500 so the
+    # find_by_* queries are never evicted and recompiled between calls
+    engine_options = {"query_cache_size": 1200}
+    if DATABASE_URI.startswith("postgresql"):
+        # The tests run on a single connection, so pre-ping checks
+        # and extra pooled connections are pure round-trip overhead
+        engine_options.update({
+            "pool_pre_ping": False,
+            "pool_size": 1,
+            "max_overflow": 0,
+        })
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options
+    Product.init_db(app)
+    yield app
+
+
+@pytest.fixture(scope="class")
+def db_transaction(app_ctx, request):  # pylint: disable=redefined-outer-name, unused-argument
+    """Runs each test class inside one rolled-back outer transaction
+
+    Opens a connection with an outer transaction for the whole class
+    and joins the session to it, so tests are isolated by rolling back
+    a SAVEPOINT instead of issuing a DELETE + COMMIT before each test.
+    """
+    app.logger.setLevel(logging.CRITICAL)
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.ERROR)
+    connection = db.engine.connect()
+    trans = connection.begin()
+    original_session = db.session
+    # autoflush is off because create()/update() commit explicitly, so
+    # there is no need to flush before every query; expire_on_commit is
+    # off (standard for the external-transaction recipe) so committed
+    # objects keep their loaded attributes instead of refreshing one
+    # row at a time on the next access
+    db.session = scoped_session(
+        sessionmaker(bind=connection, autoflush=False, expire_on_commit=False)
+    )
+    request.cls.connection = connection
+    yield connection
+    trans.rollback()
+    connection.close()
+    db.session = original_session
+
+
+@pytest.fixture(scope="class")
+def seeded_products(db_transaction, request):  # pylint: disable=redefined-outer-name, unused-argument
+    """Seeds shared products once per class for read-only query tests"""
+    products = request.cls._create_many(10)  # pylint: disable=protected-access
+    # Detach the seeds while their attributes are still loaded: the
+    # post-test session rollback expires everything the session holds,
+    # and expired seeds would refresh one row per attribute access -
+    # an N+1 the read-only tests must never pay
+    db.session.expunge_all()
+    request.cls.products = products
+    yield products
+
+
+@pytest.fixture()
+def nested_tx(db_transaction, request):  # pylint: disable=redefined-outer-name, unused-argument
+    """Wraps each test in a SAVEPOINT that is rolled back afterwards"""
+    connection = request.cls.connection
+    state = {"nested": connection.begin_nested()}
+
+    # Restart the savepoint whenever the session ends it (e.g. on commit)
+    # per the "Joining a Session into an External Transaction" recipe
+    @event.listens_for(db.session, "after_transaction_end")
+    def restart_savepoint(session, transaction):  # pylint: disable=unused-argument
+        if not state["nested"].is_active:
+            state["nested"] = connection.begin_nested()
+
+    yield
+    event.remove(db.session, "after_transaction_end", restart_savepoint)
+    # End the session transaction and discard the test's savepoint, but
+    # keep the session itself - destroying it per test forces a new
+    # Session and connection checkout on the next test for no benefit
+    db.session.rollback()
+    if state["nested"].is_active:
+        state["nested"].rollback()
+    db.session.expire_all()
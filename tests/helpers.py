@@ -0,0 +1,43 @@
+# Copyright 2016, 2023 John J. Rofrano. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Helper utilities shared by the test suite
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+@contextmanager
+def count_queries(conn):
+    """Collects the SQL statements executed on conn inside the block
+
+    Use it to pin the number of round-trips a block of code may issue,
+    so a change that re-introduces per-row queries fails immediately:
+
+        with count_queries(db.session.connection()) as queries:
+            products = Product.all()
+        self.assertLessEqual(len(queries), 1)
+    """
+    queries = []
+
+    # pylint: disable=too-many-arguments, unused-argument
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(conn, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(conn, "before_cursor_execute", before_cursor_execute)